@@ -8,14 +8,21 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
 
 import logging
-import geopandas as gpd
-import pandas as pd
 import networkx as nx
-from src.common_route_utils import get_coordinates, load_graph, save_route_to_csv
+from src.common_route_utils import (
+    get_coordinates,
+    get_drone_constraints,
+    load_graph,
+    load_health_facilities,
+    load_zones,
+    save_route_to_csv,
+    find_shortest_path,
+)
 from src.advanced_route_utils import (
     create_and_save_graph,
     add_node_to_graph,
     download_land_use_data,
+    prune_path,
 )
 
 # Configure logging
@@ -28,25 +35,6 @@ if not os.path.exists(output_dir):
     os.makedirs(output_dir)
 
 
-# Utility function to handle user inputs with validation
-def get_drone_constraints():
-    while True:
-        try:
-            drone_range_km = float(input("Enter the drone's maximum range (in km): "))
-            payload_capacity_kg = float(
-                input("Enter the drone's maximum payload capacity (in kg): ")
-            )
-            if drone_range_km <= 0 or payload_capacity_kg <= 0:
-                raise ValueError("Range and payload must be positive numbers.")
-            logging.info(
-                f"Drone constraints set: Range = {drone_range_km} km, Payload Capacity = {payload_capacity_kg} kg"
-            )
-            return drone_range_km, payload_capacity_kg
-        except ValueError as e:
-            logging.error(f"Invalid input: {e}")
-            print("Please enter valid numeric values greater than 0.")
-
-
 # Main function
 def main():
     # Define the latitude and longitude bounds for Accra
@@ -58,13 +46,7 @@ def main():
 
     # Load healthcare facilities data
     try:
-        health_facilities_df = pd.read_csv("../data/accra_facilities_filtered.csv")
-        health_facilities_gdf = gpd.GeoDataFrame(
-            health_facilities_df,
-            geometry=gpd.points_from_xy(
-                health_facilities_df.longitude, health_facilities_df.latitude
-            ),
-        )
+        health_facilities_gdf = load_health_facilities()
         logging.info("Healthcare facilities data loaded successfully.")
     except FileNotFoundError as e:
         logging.error(f"File not found: {e}")
@@ -77,8 +59,8 @@ def main():
 
     # Load no-fly zones and avoidance areas
     try:
-        no_fly_zones_gdf = gpd.read_file("../map/no_fly_zones.geojson")
-        avoidance_zones_gdf = gpd.read_file("../map/avoidance_zones.geojson")
+        no_fly_zones_gdf = load_zones("../map/no_fly_zones.geojson")
+        avoidance_zones_gdf = load_zones("../map/avoidance_zones.geojson")
         logging.info("No-fly zones and avoidance areas loaded successfully.")
     except FileNotFoundError as e:
         logging.error(f"File not found: {e}")
@@ -99,7 +81,30 @@ def main():
         logging.error(f"Error downloading land use data: {e}")
         sys.exit("An error occurred while downloading land use data.")
 
-    graph_path = os.path.join(output_dir, "advanced_route.pkl")
+    # Project every layer into the local UTM zone once, so intersections and
+    # edge weights are worked out in meters
+    utm_crs = health_facilities_gdf.estimate_utm_crs()
+    (
+        health_facilities_gdf,
+        no_fly_zones_gdf,
+        avoidance_zones_gdf,
+        roads_gdf,
+        buildings_gdf,
+        open_space_gdf,
+    ) = (
+        gdf.to_crs(utm_crs)
+        for gdf in (
+            health_facilities_gdf,
+            no_fly_zones_gdf,
+            avoidance_zones_gdf,
+            roads_gdf,
+            buildings_gdf,
+            open_space_gdf,
+        )
+    )
+    logging.info(f"Projected all layers to {utm_crs.name}.")
+
+    graph_path = os.path.join(output_dir, "advanced_route.parquet")
 
     # Check if the graph already exists and load it, otherwise create and save it
     G = load_graph(graph_path)
@@ -156,9 +161,22 @@ def main():
     # If start and end nodes are successfully added, proceed with pathfinding
     if start_node is not None and end_node is not None:
         try:
-            shortest_path = nx.dijkstra_path(G, start_node, end_node, weight="weight")
+            shortest_path = find_shortest_path(G, start_node, end_node)
             logging.info(f"Shortest path found: {shortest_path}")
 
+            # Skip waypoints the drone can fly past directly
+            shortest_path = prune_path(
+                shortest_path,
+                G,
+                roads_gdf,
+                buildings_gdf,
+                open_space_gdf,
+                no_fly_zones_gdf,
+                avoidance_zones_gdf,
+                drone_range_km,
+            )
+            logging.info(f"Pruned path: {shortest_path}")
+
             pos = nx.get_node_attributes(G, "pos")
 
             # Handle nodes without positions
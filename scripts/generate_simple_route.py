@@ -7,15 +7,16 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 # Add the parent directory to the sys.path
 sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
 
-import pandas as pd
-import geopandas as gpd
 import networkx as nx
 import logging
 from src.common_route_utils import (
     get_coordinates,
     load_graph,
+    load_health_facilities,
+    load_zones,
     save_route_to_csv,
     get_drone_constraints,
+    find_shortest_path,
 )
 from src.simple_route_utils import create_and_save_graph, add_node_to_graph
 
@@ -36,13 +37,7 @@ def main():
 
     # Load healthcare facilities data
     try:
-        health_facilities_df = pd.read_csv("../data/accra_facilities_filtered.csv")
-        health_facilities_gdf = gpd.GeoDataFrame(
-            health_facilities_df,
-            geometry=gpd.points_from_xy(
-                health_facilities_df.longitude, health_facilities_df.latitude
-            ),
-        )
+        health_facilities_gdf = load_health_facilities()
         logging.info("Healthcare facilities data loaded successfully.")
     except FileNotFoundError as e:
         logging.error(f"File not found: {e}")
@@ -55,8 +50,8 @@ def main():
 
     # Load no-fly zones and avoidance areas
     try:
-        no_fly_zones_gdf = gpd.read_file("../map/no_fly_zones.geojson")
-        avoidance_zones_gdf = gpd.read_file("../map/avoidance_zones.geojson")
+        no_fly_zones_gdf = load_zones("../map/no_fly_zones.geojson")
+        avoidance_zones_gdf = load_zones("../map/avoidance_zones.geojson")
         logging.info("No-fly zones and avoidance areas loaded successfully.")
     except FileNotFoundError as e:
         logging.error(f"File not found: {e}")
@@ -109,7 +104,7 @@ def main():
     # If start and end nodes are successfully added, proceed with pathfinding
     if start_node is not None and end_node is not None:
         try:
-            shortest_path = nx.dijkstra_path(G, start_node, end_node, weight="weight")
+            shortest_path = find_shortest_path(G, start_node, end_node)
             logging.info(f"Shortest path found: {shortest_path}")
             pos = nx.get_node_attributes(G, "pos")
             save_route_to_csv(G, shortest_path, pos)
@@ -11,41 +11,163 @@ Functions:
   Calculates the weight of a segment based on intersection with roads, buildings, open spaces, and avoidance zones.
 - calculate_edge_weight(line, roads_gdf, buildings_gdf, open_space_gdf, avoidance_zones_gdf):
   Calculates the total weight of an edge by summing the weights of its segments.
+- calculate_edge_weights(lines, roads_gdf, buildings_gdf, open_space_gdf, avoidance_zones_gdf, segment_length):
+  Calculates the total weights of many edges at once, querying each land use layer a single time.
 - create_and_save_graph(health_facilities_gdf, roads_gdf, buildings_gdf, open_space_gdf, no_fly_zones_gdf, avoidance_zones_gdf, drone_range_km, output_path):
   Creates a network graph with advanced constraints and saves it to a file.
 - add_node_to_graph(G, lat, lon, node_name, health_facilities_gdf, roads_gdf, buildings_gdf, open_space_gdf, no_fly_zones_gdf, avoidance_zones_gdf, drone_range_km):
   Adds a new node to the existing graph, considering advanced constraints.
-- download_land_use_data(place_name): Downloads land use data (roads, buildings, open spaces) for a specified place using OSMnx.
+- prune_path(path, G, roads_gdf, buildings_gdf, open_space_gdf, no_fly_zones_gdf, avoidance_zones_gdf, drone_range_km):
+  Removes waypoints that can be skipped with a direct, feasible flight that costs no more.
+- download_land_use_data(place_name, cache_dir): Downloads land use data (roads, buildings, open spaces) for a specified place
+  using OSMnx, caching it as Parquet files for later runs.
 """
 
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import geopandas as gpd
 import networkx as nx
-from shapely.geometry import LineString
-from geopy.distance import geodesic
-import pickle
+import numpy as np
+import shapely
+from pyproj import Transformer
+from shapely.geometry import Point
+from src.common_route_utils import (
+    EARTH_RADIUS_KM,
+    haversine_km,
+    intersects_mask,
+    save_graph,
+)
+from src.graph_utils import (
+    add_facility_nodes,
+    allocate_node_id,
+    edges_from_point,
+    facility_edges,
+)
+
+
+def _lonlat_transformer(crs):
+    """
+    Builds a transformer from longitude/latitude into a coordinate reference system.
+
+    Args:
+        crs (pyproj.CRS): The target coordinate reference system, or None if unknown.
+
+    Returns:
+        pyproj.Transformer: The transformer, or None if the CRS is missing or geographic and
+        longitude/latitude coordinates can be used as they are.
+    """
+    if crs is None or crs.is_geographic:
+        return None
+    return Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+
+
+def _search_box(lat, lon, distance_km, crs=None):
+    """
+    Builds a bounding box containing every point within a distance of a location.
+
+    Args:
+        lat (float): The latitude of the location in decimal degrees.
+        lon (float): The longitude of the location in decimal degrees.
+        distance_km (float): The search distance in kilometers.
+        crs (pyproj.CRS): The coordinate reference system of the box. Defaults to longitude/latitude.
+
+    Returns:
+        shapely.geometry.Polygon: The bounding box of the search area.
+    """
+    angle = distance_km / EARTH_RADIUS_KM
+    dlat = np.degrees(angle)
+
+    # Great circles bulge towards the poles, so the widest point of the search
+    # area is further east/west than distance / (radius * cos(lat))
+    ratio = np.sin(angle) / np.cos(np.radians(lat))
+    dlon = np.degrees(np.arcsin(ratio)) if angle < np.pi / 2 and ratio < 1 else 180.0
+
+    bounds = (lon - dlon, lat - dlat, lon + dlon, lat + dlat)
+    transformer = _lonlat_transformer(crs)
+    if transformer is not None:
+        # The box edges curve once projected, so densify them to keep every point inside
+        bounds = transformer.transform_bounds(*bounds)
+
+    return shapely.box(*bounds)
+
+
+def _prepared_candidates(gdf, geometry):
+    """
+    Finds the geometries of a GeoDataFrame whose bounding boxes intersect the given geometry.
+
+    The candidates are prepared in place, so repeated predicate tests against the same
+    polygons reuse GEOS's cached edge index instead of rebuilding it on every call.
+
+    Args:
+        gdf (geopandas.GeoDataFrame): GeoDataFrame whose spatial index is queried.
+        geometry (shapely.geometry.base.BaseGeometry): The geometry to find candidates for.
+
+    Returns:
+        numpy.ndarray: An array of prepared candidate geometries.
+    """
+    candidates = np.asarray(gdf.geometry.values)[gdf.sindex.query(geometry)]
+    shapely.prepare(candidates)
+    return candidates
 
 
-def segment_edge(line, segment_length=1):
+def segment_edge(line, segment_length=100):
     """
     Segments a given line into smaller segments of a specified length.
 
     Args:
         line (shapely.geometry.LineString): The line to be segmented.
-        segment_length (float): The desired length of each segment.
+        segment_length (float): The desired length of each segment, in the units of the line's CRS.
 
     Returns:
-        list: A list of LineString objects representing the segments of the original line.
+        numpy.ndarray: An array of LineString objects representing the segments of the original line.
     """
-    segments = []
     num_segments = int(line.length / segment_length)
-    for i in range(num_segments):
-        segment = LineString(
-            [
-                line.interpolate(i / num_segments, normalized=True),
-                line.interpolate((i + 1) / num_segments, normalized=True),
-            ]
+    if num_segments == 0:
+        return np.empty(0, dtype=object)
+
+    fractions = np.linspace(0, 1, num_segments + 1)
+    coords = shapely.get_coordinates(line)
+    if len(coords) == 2:
+        # Straight lines can be interpolated directly from their end points
+        points = coords[0] + (coords[1] - coords[0]) * fractions[:, None]
+    else:
+        points = shapely.get_coordinates(
+            shapely.line_interpolate_point(line, fractions, normalized=True)
         )
-        segments.append(segment)
-    return segments
+
+    return shapely.linestrings(np.stack([points[:-1], points[1:]], axis=1))
+
+
+def _segment_lines(lines, segment_length):
+    """
+    Segments many lines at once into a single flat array of segments.
+
+    Args:
+        lines (numpy.ndarray): Array of LineStrings to be segmented.
+        segment_length (float): The desired length of each segment, in the units of the lines' CRS.
+
+    Returns:
+        tuple: The segments as an array of LineStrings, and an array giving the index of the
+        line each segment belongs to.
+    """
+    counts = (shapely.length(lines) / segment_length).astype(int)
+    line_idx = np.repeat(np.arange(len(lines)), counts)
+
+    if shapely.get_num_coordinates(lines).max(initial=0) > 2:
+        # Multi-vertex lines are interpolated along their length one at a time
+        segments = [segment_edge(line, segment_length) for line in lines]
+        return np.concatenate([np.empty(0, dtype=object)] + segments), line_idx
+
+    # Straight lines are interpolated between their end points in one vectorised pass
+    ends = shapely.get_coordinates(lines).reshape(-1, 2, 2)[line_idx]
+    step = np.arange(len(line_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+    num_segments = counts[line_idx]
+    direction = ends[:, 1] - ends[:, 0]
+    starts = ends[:, 0] + direction * (step / num_segments)[:, None]
+    stops = ends[:, 0] + direction * ((step + 1) / num_segments)[:, None]
+
+    return shapely.linestrings(np.stack([starts, stops], axis=1)), line_idx
 
 
 def calculate_segment_weight(
@@ -67,13 +189,15 @@ def calculate_segment_weight(
     """
     weight = segment.length  # Start with the base weight (length of the segment)
 
-    if roads_gdf.intersects(segment).any():
+    if shapely.intersects(_prepared_candidates(roads_gdf, segment), segment).any():
         weight *= 1.5  # Increase weight if segment intersects a road
-    if buildings_gdf.intersects(segment).any():
+    if shapely.intersects(_prepared_candidates(buildings_gdf, segment), segment).any():
         weight *= 1  # Increase weight if segment intersects a building
-    if open_space_gdf.intersects(segment).any():
+    if shapely.intersects(_prepared_candidates(open_space_gdf, segment), segment).any():
         weight *= 0.8  # Decrease weight if segment intersects open space
-    if avoidance_zones_gdf.intersects(segment).any():
+    if shapely.intersects(
+        _prepared_candidates(avoidance_zones_gdf, segment), segment
+    ).any():
         weight *= 3  # Heavily increase weight if segment intersects an avoidance zone
 
     return weight
@@ -95,14 +219,53 @@ def calculate_edge_weight(
     Returns:
         float: The total weight of the edge.
     """
-    segments = segment_edge(line)
-    total_weight = sum(
-        calculate_segment_weight(
-            segment, roads_gdf, buildings_gdf, open_space_gdf, avoidance_zones_gdf
-        )
-        for segment in segments
+    return float(
+        calculate_edge_weights(
+            np.array([line]),
+            roads_gdf,
+            buildings_gdf,
+            open_space_gdf,
+            avoidance_zones_gdf,
+        )[0]
     )
-    return total_weight
+
+
+def calculate_edge_weights(
+    lines,
+    roads_gdf,
+    buildings_gdf,
+    open_space_gdf,
+    avoidance_zones_gdf,
+    segment_length=100,
+):
+    """
+    Calculates the total weights of many edges at once.
+
+    The segments of every edge are flattened into one array, so each land use layer is queried
+    a single time for the whole batch before the segment weights are summed per edge.
+
+    Args:
+        lines (numpy.ndarray): Array of LineStrings representing the edges.
+        roads_gdf (geopandas.GeoDataFrame): GeoDataFrame containing road geometries.
+        buildings_gdf (geopandas.GeoDataFrame): GeoDataFrame containing building geometries.
+        open_space_gdf (geopandas.GeoDataFrame): GeoDataFrame containing open space geometries.
+        avoidance_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing avoidance zone geometries.
+        segment_length (float): The desired length of each segment, in the units of the lines' CRS
+            (meters for a projected CRS).
+
+    Returns:
+        numpy.ndarray: The total weight of each edge.
+    """
+    segments, line_idx = _segment_lines(lines, segment_length)
+
+    # Apply the same multipliers as calculate_segment_weight to every segment
+    weights = shapely.length(segments)
+    weights[intersects_mask(roads_gdf, segments)] *= 1.5
+    weights[intersects_mask(buildings_gdf, segments)] *= 1
+    weights[intersects_mask(open_space_gdf, segments)] *= 0.8
+    weights[intersects_mask(avoidance_zones_gdf, segments)] *= 3
+
+    return np.bincount(line_idx, weights=weights, minlength=len(lines))
 
 
 def create_and_save_graph(
@@ -120,6 +283,8 @@ def create_and_save_graph(
 
     Nodes represent healthcare facilities, and edges are created between facilities that are within
     a specified drone range, with consideration of roads, buildings, open spaces, no-fly zones, and avoidance areas.
+    Every GeoDataFrame must share one CRS, ideally a projected one so that edge weights are in meters;
+    ranges are always measured from the facilities' latitude and longitude columns.
 
     Args:
         health_facilities_gdf (geopandas.GeoDataFrame): GeoDataFrame containing healthcare facilities with geometry points.
@@ -129,41 +294,34 @@ def create_and_save_graph(
         no_fly_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing no-fly zones as polygons.
         avoidance_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing avoidance zones as polygons.
         drone_range_km (float): The maximum distance the drone can travel between facilities in kilometers.
-        output_path (str): The file path where the graph will be saved as a pickle file.
+        output_path (str): The pickle file or Parquet directory the graph will be saved to (see save_graph).
 
     Returns:
         None
     """
     G = nx.Graph()
 
-    for idx1, row1 in health_facilities_gdf.iterrows():
-        if not no_fly_zones_gdf.contains(row1.geometry).any():
-            G.add_node(idx1, pos=(row1["longitude"], row1["latitude"]))
-
-            for idx2, row2 in health_facilities_gdf.iterrows():
-                if idx1 != idx2:
-                    distance = geodesic(
-                        (row1["latitude"], row1["longitude"]),
-                        (row2["latitude"], row2["longitude"]),
-                    ).km
-
-                    if distance <= drone_range_km:
-                        line = LineString([row1.geometry, row2.geometry])
-
-                        if no_fly_zones_gdf.intersects(line).any():
-                            continue  # Skip if the line intersects a no-fly zone
-
-                        edge_weight = calculate_edge_weight(
-                            line,
-                            roads_gdf,
-                            buildings_gdf,
-                            open_space_gdf,
-                            avoidance_zones_gdf,
-                        )
-                        G.add_edge(idx1, idx2, weight=edge_weight)
-
-    with open(output_path, "wb") as f:
-        pickle.dump(G, f)
+    # Add healthcare facilities outside the no-fly zones as nodes, and join those in
+    # range, where single precision is ample for the range checks
+    outside_no_fly = add_facility_nodes(G, health_facilities_gdf, no_fly_zones_gdf)
+    ii, jj, _, lines = facility_edges(
+        health_facilities_gdf,
+        no_fly_zones_gdf,
+        drone_range_km,
+        outside_no_fly,
+        dtype=np.float32,
+    )
+
+    edge_weights = calculate_edge_weights(
+        lines, roads_gdf, buildings_gdf, open_space_gdf, avoidance_zones_gdf
+    )
+    index = health_facilities_gdf.index.tolist()
+    G.add_weighted_edges_from(
+        (index[i], index[j], edge_weight)
+        for i, j, edge_weight in zip(ii, jj, edge_weights.tolist())
+    )
+
+    save_graph(G, output_path)
     print(f"Network graph created and saved as '{output_path}'.")
 
 
@@ -183,6 +341,7 @@ def add_node_to_graph(
     """
     Adds a new node to the existing network graph, connecting it to other nodes within the drone's range,
     considering advanced constraints such as roads, buildings, open spaces, no-fly zones, and avoidance areas.
+    The new node's coordinates are projected into the CRS shared by the GeoDataFrames.
 
     Args:
         G (networkx.Graph): The existing graph to which the node will be added.
@@ -201,59 +360,181 @@ def add_node_to_graph(
         int: The index of the newly added node.
         None: If the node is within a no-fly zone and cannot be added.
     """
-    from shapely.geometry import Point
+    crs = health_facilities_gdf.crs
+    transformer = _lonlat_transformer(crs)
+    x, y = (lon, lat) if transformer is None else transformer.transform(lon, lat)
 
-    point = Point(lon, lat)
-    if no_fly_zones_gdf.contains(point).any():
+    point = Point(x, y)
+    # The spatial index narrows the test to the zones around the point
+    if no_fly_zones_gdf.sindex.query(point, predicate="within").size:
         print(f"{node_name} is within a no-fly zone and cannot be added.")
         return None
 
-    new_node_idx = max(G.nodes) + 1 if len(G.nodes) > 0 else 0
+    new_node_idx = allocate_node_id(G)
     G.add_node(new_node_idx, pos=(lon, lat), name=node_name)
 
-    pos = nx.get_node_attributes(G, "pos")
-    pos[new_node_idx] = (lon, lat)
-    nx.set_node_attributes(G, pos, "pos")
+    # Only facilities inside the search area's bounding box can be within range
+    candidate_idx = np.sort(
+        health_facilities_gdf.sindex.query(_search_box(lat, lon, drone_range_km, crs))
+    )
+    lats = health_facilities_gdf["latitude"].to_numpy(np.float32)[candidate_idx]
+    lons = health_facilities_gdf["longitude"].to_numpy(np.float32)[candidate_idx]
+    distances = haversine_km(np.float32(lat), np.float32(lon), lats, lons)
+    in_range = candidate_idx[distances <= drone_range_km]
+    targets, lines = edges_from_point(
+        x, y, node_name, health_facilities_gdf, no_fly_zones_gdf, in_range
+    )
+
+    edge_weights = calculate_edge_weights(
+        lines, roads_gdf, buildings_gdf, open_space_gdf, avoidance_zones_gdf
+    )
+    index = health_facilities_gdf.index.tolist()
+    G.add_weighted_edges_from(
+        (new_node_idx, index[i], edge_weight)
+        for i, edge_weight in zip(targets, edge_weights.tolist())
+    )
+
+    return new_node_idx
+
+
+def prune_path(
+    path,
+    G,
+    roads_gdf,
+    buildings_gdf,
+    open_space_gdf,
+    no_fly_zones_gdf,
+    avoidance_zones_gdf,
+    drone_range_km,
+):
+    """
+    Removes redundant waypoints from a route wherever a direct flight between them is feasible
+    and no costlier than the route it replaces.
+
+    The route is scanned forwards from the start. Each anchor node is joined directly to the
+    furthest following node that can be reached in a straight line within the drone's range,
+    without crossing a no-fly zone, and with an edge weight (see calculate_edge_weights) no
+    greater than the summed weights of the graph edges it skips, stopping at the first node that
+    cannot be. This keeps the route clear of the avoidance zones and land use the weighted graph
+    steered it around. Node positions are projected into the CRS shared by the GeoDataFrames.
+
+    Args:
+        path (list): The nodes of the route, from start to end.
+        G (networkx.Graph): The graph containing the route's nodes, their positions and edge weights.
+        roads_gdf (geopandas.GeoDataFrame): GeoDataFrame containing road geometries.
+        buildings_gdf (geopandas.GeoDataFrame): GeoDataFrame containing building geometries.
+        open_space_gdf (geopandas.GeoDataFrame): GeoDataFrame containing open space geometries.
+        no_fly_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing no-fly zones as polygons.
+        avoidance_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing avoidance zones as polygons.
+        drone_range_km (float): The maximum distance the drone can travel between nodes in kilometers.
 
-    for idx, row in health_facilities_gdf.iterrows():
-        distance = geodesic((lat, lon), (row["latitude"], row["longitude"])).km
-        if distance <= drone_range_km:
-            line = LineString([point, row.geometry])
+    Returns:
+        list: The pruned route, always keeping the first and last nodes.
+    """
+    if len(path) <= 2:
+        return list(path)
 
-            if no_fly_zones_gdf.intersects(line).any():
-                print(
-                    f"Edge from {node_name} to {row['name']} intersects a no-fly zone, not adding."
-                )
-                continue  # Skip if the line intersects a no-fly zone
+    lons, lats = np.array([G.nodes[node]["pos"] for node in path], dtype=float).T
+    transformer = _lonlat_transformer(no_fly_zones_gdf.crs)
+    xs, ys = (lons, lats) if transformer is None else transformer.transform(lons, lats)
 
-            edge_weight = calculate_edge_weight(
-                line, roads_gdf, buildings_gdf, open_space_gdf, avoidance_zones_gdf
+    # The weight of the route from its start to each node, so any stretch of it is a difference
+    route_weights = np.cumsum(
+        [0] + [G.edges[u, v].get("weight", 1) for u, v in zip(path, path[1:])]
+    )
+
+    pruned = [path[0]]
+    anchor = 0
+    while anchor < len(path) - 1:
+        ahead = np.arange(anchor + 1, len(path))
+        lines = shapely.linestrings(
+            np.stack(
+                [
+                    np.broadcast_to([xs[anchor], ys[anchor]], (len(ahead), 2)),
+                    np.column_stack([xs[ahead], ys[ahead]]),
+                ],
+                axis=1,
             )
-            G.add_edge(new_node_idx, idx, weight=edge_weight)
+        )
+        distances = haversine_km(lats[anchor], lons[anchor], lats[ahead], lons[ahead])
+        feasible = (distances <= drone_range_km) & ~intersects_mask(
+            no_fly_zones_gdf, lines
+        )
 
-    return new_node_idx
+        # Only weigh the shortcuts that are otherwise feasible
+        candidates = np.flatnonzero(feasible)
+        shortcut_weights = calculate_edge_weights(
+            lines[candidates],
+            roads_gdf,
+            buildings_gdf,
+            open_space_gdf,
+            avoidance_zones_gdf,
+        )
+        skipped_weights = route_weights[ahead[candidates]] - route_weights[anchor]
+        # Allow for rounding, so a shortcut past a node at the same spot is not refused
+        feasible[candidates] = shortcut_weights <= skipped_weights * (1 + 1e-9)
+        feasible[0] = True  # The next node on the route is always reachable
+
+        blocked = np.flatnonzero(~feasible)
+        anchor = ahead[blocked[0] - 1] if blocked.size else ahead[-1]
+        pruned.append(path[anchor])
+
+    return pruned
 
 
-def download_land_use_data(place_name="Accra, Ghana"):
+def download_land_use_data(place_name="Accra, Ghana", cache_dir="../cache"):
     """
     Downloads land use data (roads, buildings, open spaces) for a specified place using OSMnx.
 
+    The three layers are requested concurrently. The downloaded geometries are cached as Parquet
+    files keyed by the place name, so later calls for the same place load them from disk instead
+    of querying OpenStreetMap again.
+
     Args:
         place_name (str): The name of the place to download land use data for.
+        cache_dir (str): The directory where downloaded land use data is cached.
 
     Returns:
         tuple: A tuple containing GeoDataFrames for roads, buildings, and open spaces.
     """
+    key = hashlib.sha1(place_name.encode()).hexdigest()[:12]
+    cache_paths = [
+        Path(cache_dir) / f"{key}_{name}.parquet"
+        for name in ("roads", "buildings", "open_space")
+    ]
+    if all(path.exists() for path in cache_paths):
+        print("Loading cached land use data...")
+        return tuple(gpd.read_parquet(path) for path in cache_paths)
+
     import osmnx as ox
 
     print("Downloading land use data...")
 
-    roads = ox.graph_from_place(place_name, network_type="drive")
-    roads_gdf = ox.graph_to_gdfs(roads, nodes=False, edges=True)
+    # The three Overpass queries are independent and spend their time waiting on
+    # the network, so run them side by side
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        roads_future = executor.submit(
+            ox.graph_from_place, place_name, network_type="drive"
+        )
+        buildings_future = executor.submit(
+            ox.features_from_place, place_name, tags={"building": True}
+        )
+        open_space_future = executor.submit(
+            ox.features_from_place, place_name, tags={"leisure": "park"}
+        )
 
-    buildings_gdf = ox.geometries_from_place(place_name, tags={"building": True})
+        roads_gdf = ox.graph_to_gdfs(roads_future.result(), nodes=False, edges=True)
+        buildings_gdf = buildings_future.result()
+        open_space_gdf = open_space_future.result()
 
-    open_space_gdf = ox.geometries_from_place(place_name, tags={"leisure": "park"})
+    # Only the geometries are used for weighting, and the OSM attribute columns
+    # often mix types that cannot be written to Parquet
+    land_use_gdfs = tuple(
+        gdf[["geometry"]] for gdf in (roads_gdf, buildings_gdf, open_space_gdf)
+    )
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    for gdf, path in zip(land_use_gdfs, cache_paths):
+        gdf.to_parquet(path)
 
     print("Land use data downloaded successfully.")
-    return roads_gdf, buildings_gdf, open_space_gdf
+    return land_use_gdfs
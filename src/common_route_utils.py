@@ -2,32 +2,180 @@
 common_route_utils.py
 
 This module provides utility functions that are commonly used across different drone routing scripts.
-It includes functions for obtaining user inputs, loading and saving graph data, and handling
-common drone constraints.
+It includes distance and geometry helpers shared by the routing algorithms, functions for obtaining
+user inputs, loading and saving graph and route data, and handling common drone constraints.
 
 Functions:
-- get_coordinates(lat_range, lon_range): Prompts the user to enter valid coordinates within a specified range.
-- load_graph(graph_path): Loads a previously saved graph from a pickle file.
+- haversine_km(lat1, lon1, lat2, lon2): Calculates great-circle distances in kilometers, broadcasting over NumPy arrays.
+- pairs_within_range(lats, lons, max_km, block_size): Finds every pair of points within a distance, in row blocks.
+- prepared_union(gdf): Merges the geometries of a GeoDataFrame into a single prepared geometry.
+- intersects_mask(gdf, geometries): Flags which geometries intersect any geometry of a GeoDataFrame.
+- get_coordinates(lat_range, lon_range, value): Prompts the user to enter valid coordinates within a specified range,
+  or validates given ones.
+- save_graph(G, output_path): Saves a graph as a compressed pickle file or as Parquet node and edge tables.
+- load_graph(graph_path): Loads a previously saved graph from a pickle file or Parquet tables.
+- load_positions(graph_path): Loads only the node positions of a previously saved graph.
+- load_health_facilities(csv_path, cache_dir): Loads the healthcare facilities as points, cached as Feather.
+- load_zones(geojson_path, cache_dir): Loads no-fly or avoidance zones from GeoJSON, cached as Feather.
 - save_route_to_csv(G, shortest_path, pos, csv_file_path): Saves a computed drone route to a CSV file.
-- get_drone_constraints(): Prompts the user to input drone constraints (range and payload) with validation.
+- build_path_index(G, weight): Flattens a graph into a sparse adjacency matrix for repeated path queries.
+- find_shortest_path(G, source, target, weight, index): Finds the lowest-weight path between two nodes,
+  using SciPy's Dijkstra when given an index.
+- get_drone_constraints(value): Prompts the user to input drone constraints (range and payload) with validation,
+  or validates given ones.
 """
 
+import hashlib
 import logging
 import pickle
-import csv
+from itertools import chain
+from pathlib import Path
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import dijkstra
+import zstandard as zstd
 
+EARTH_RADIUS_KM = 6371.0088  # Mean radius of the Earth in kilometers
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"  # The bytes every zstd frame starts with
+PICKLE_SUFFIXES = (".pkl", ".pickle", ".gpickle")  # Graph files saved as pickles
+PARQUET_SUFFIX = ".parquet"  # Graph directories saved as Parquet tables
 
-def get_coordinates(lat_range, lon_range):
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Calculates the great-circle distance between points using the haversine formula.
+
+    The arguments may be scalars or NumPy arrays, which are broadcast against each other.
+
+    Args:
+        lat1 (float or numpy.ndarray): Latitude(s) of the first point(s) in decimal degrees.
+        lon1 (float or numpy.ndarray): Longitude(s) of the first point(s) in decimal degrees.
+        lat2 (float or numpy.ndarray): Latitude(s) of the second point(s) in decimal degrees.
+        lon2 (float or numpy.ndarray): Longitude(s) of the second point(s) in decimal degrees.
+
+    Returns:
+        float or numpy.ndarray: The distance(s) between the points in kilometers.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def pairs_within_range(lats, lons, max_km, block_size=1024):
+    """
+    Finds every unordered pair of points within a given great-circle distance of each other.
+
+    The distances are computed a block of rows at a time, and only from each block's first row
+    onwards, so memory grows with block_size times the number of points rather than its square.
+
+    Args:
+        lats (numpy.ndarray): Latitudes of the points in decimal degrees.
+        lons (numpy.ndarray): Longitudes of the points in decimal degrees.
+        max_km (float): The maximum distance between the points of a pair in kilometers.
+        block_size (int): The number of rows of the distance matrix computed at once.
+
+    Returns:
+        tuple: Arrays of the first and second point indices (i < j) of each pair, ordered by i
+        then j, and the distance between them in kilometers.
+    """
+    ii, jj, dd = [np.empty(0, dtype=np.intp)], [np.empty(0, dtype=np.intp)], []
+    for start in range(0, len(lats), block_size):
+        stop = min(start + block_size, len(lats))
+        distances = haversine_km(
+            lats[start:stop, None],
+            lons[start:stop, None],
+            lats[None, start:],
+            lons[None, start:],
+        )
+
+        # Columns are offset by the block's start, so j > i keeps the upper triangle
+        rows, cols = np.nonzero(distances <= max_km)
+        upper = cols > rows
+        rows, cols = rows[upper], cols[upper]
+        ii.append(rows + start)
+        jj.append(cols + start)
+        dd.append(distances[rows, cols])
+
+    distances = np.concatenate(dd) if dd else np.empty(0, dtype=np.result_type(lats))
+    return np.concatenate(ii), np.concatenate(jj), distances
+
+
+def prepared_union(gdf):
+    """
+    Merges the geometries of a GeoDataFrame into a single prepared geometry.
+
+    Args:
+        gdf (geopandas.GeoDataFrame): GeoDataFrame whose geometries are merged.
+
+    Returns:
+        shapely.geometry.base.BaseGeometry: The prepared union of the geometries.
+    """
+    union = shapely.union_all(np.asarray(gdf.geometry.values))
+    shapely.prepare(union)
+    return union
+
+
+def intersects_mask(gdf, geometries):
+    """
+    Flags which of the given geometries intersect any geometry in a GeoDataFrame.
+
+    Args:
+        gdf (geopandas.GeoDataFrame): GeoDataFrame whose spatial index is queried.
+        geometries (numpy.ndarray): Array of shapely geometries to test.
+
+    Returns:
+        numpy.ndarray: A boolean array, True where the geometry intersects the GeoDataFrame.
+    """
+    # Narrow down to bounding box matches, then test them against prepared geometries,
+    # which GEOS indexes once rather than once per geometry tested
+    geometry_idx, tree_idx = gdf.sindex.query(geometries)
+    tree_geometries = np.asarray(gdf.geometry.values)[tree_idx]
+    shapely.prepare(tree_geometries)
+    hits = shapely.intersects(tree_geometries, geometries[geometry_idx])
+
+    mask = np.zeros(len(geometries), dtype=bool)
+    mask[geometry_idx[hits]] = True
+    return mask
+
+
+def _within_range(latitude, longitude, lat_range, lon_range):
+    """
+    Checks whether coordinates lie within the given latitude and longitude ranges (inclusive).
+    """
+    within_lat = lat_range[0] <= latitude <= lat_range[1]
+    within_lon = lon_range[0] <= longitude <= lon_range[1]
+    return within_lat and within_lon
+
+
+def get_coordinates(lat_range, lon_range, value=None):
     """
     Prompts the user to input valid latitude and longitude coordinates within a specified range.
 
     Args:
         lat_range (tuple): A tuple specifying the valid range of latitudes (min_lat, max_lat).
         lon_range (tuple): A tuple specifying the valid range of longitudes (min_lon, max_lon).
+        value (tuple): Optional (latitude, longitude) to validate instead of prompting the user.
 
     Returns:
         tuple: A tuple containing the validated latitude and longitude (latitude, longitude).
+
+    Raises:
+        ValueError: If a given value is not numeric or not within the valid range.
     """
+    if value is not None:
+        latitude, longitude = map(float, value)
+        if not _within_range(latitude, longitude, lat_range, lon_range):
+            raise ValueError(
+                f"Coordinates ({latitude}, {longitude}) are not within the valid range."
+            )
+        return latitude, longitude
+
     while True:
         try:
             # Prompt user for latitude and longitude
@@ -35,9 +183,7 @@ def get_coordinates(lat_range, lon_range):
             longitude = float(input("Enter the longitude (in decimal degrees): "))
 
             # Validate if the coordinates are within the specified bounds
-            if (
-                lat_range[0] <= latitude <= lat_range[1] and lon_range[0] <= longitude <= lon_range[1]
-            ):
+            if _within_range(latitude, longitude, lat_range, lon_range):
                 print(
                     f"Coordinates ({latitude}, {longitude}) are valid within the specified range."
                 )
@@ -52,20 +198,164 @@ def get_coordinates(lat_range, lon_range):
             )
 
 
+def _graph_format(graph_path):
+    """
+    Works out from its suffix whether a graph path is a pickle file or a Parquet directory.
+
+    Raises:
+        ValueError: If the suffix is not a pickle or Parquet one.
+    """
+    if graph_path.suffix in PICKLE_SUFFIXES:
+        return "pickle"
+    if graph_path.suffix == PARQUET_SUFFIX:
+        return "parquet"
+    raise ValueError(
+        f"Unrecognised graph path '{graph_path}': expected a pickle file "
+        f"({', '.join(PICKLE_SUFFIXES)}) or a '{PARQUET_SUFFIX}' directory."
+    )
+
+
+def _positions_path(graph_path):
+    """
+    Returns the path of the node positions file saved next to a pickled graph.
+    """
+    return graph_path.with_name(f"{graph_path.name}.pos.npz")
+
+
+def _save_positions(positions, positions_path):
+    """
+    Saves node positions to the ``.pos.npz`` file next to a pickled graph.
+
+    NumPy arrays cannot hold a mix of node ID types without pickling them, so the file is only
+    written when every node ID is an integer. Otherwise any previous file is removed, and
+    load_positions reads the positions from the pickle instead.
+
+    Args:
+        positions (dict): A dictionary of (longitude, latitude) node positions keyed by node IDs.
+        positions_path (pathlib.Path): The positions file to write.
+
+    Returns:
+        None
+    """
+    if not all(type(node) is int for node in positions):
+        logging.warning(
+            f"Node IDs are not all integers, so '{positions_path}' is not written."
+        )
+        positions_path.unlink(missing_ok=True)
+        return
+
+    lons, lats = zip(*positions.values()) if positions else ((), ())
+    # Positions are kept in double precision so routes written from them are exact
+    np.savez(
+        positions_path,
+        node_ids=np.array(list(positions), dtype=np.int64),
+        lons=np.array(lons, dtype=np.float64),
+        lats=np.array(lats, dtype=np.float64),
+    )
+
+
+def save_graph(G, output_path):
+    """
+    Saves a network graph to disk.
+
+    Paths ending in ``.pkl``, ``.pickle`` or ``.gpickle`` are written as a zstd-compressed pickle
+    file. When every node ID is an integer, the positions of the nodes that have one are also
+    saved to a ``.pos.npz`` file next to it (see load_positions). Paths ending in ``.parquet`` are
+    written as a directory holding two Parquet tables, ``nodes.parquet`` (node id and position)
+    and ``edges.parquet`` (end nodes and weight), which load column by column without unpickling
+    a whole NetworkX object. Only node positions and edge weights are kept in this format, with
+    missing positions stored as nulls.
+
+    Args:
+        G (networkx.Graph): The graph to save.
+        output_path (str): The pickle file or Parquet directory to save the graph to.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the path has neither a pickle nor a ``.parquet`` suffix.
+    """
+    output_path = Path(output_path)
+    graph_format = _graph_format(output_path)
+    positions = nx.get_node_attributes(G, "pos")
+
+    if graph_format == "pickle":
+        compressor = zstd.ZstdCompressor(level=3)
+        # A large buffer batches the compressor's small chunks into few writes
+        with open(output_path, "wb", buffering=4 * 1024 * 1024) as f:
+            with compressor.stream_writer(f) as writer:
+                pickle.dump(G, writer, protocol=5)
+        _save_positions(positions, _positions_path(output_path))
+        return
+
+    nodes = list(G.nodes)
+    missing = (np.nan, np.nan)
+    lons, lats = (
+        zip(*(positions.get(node, missing) for node in nodes)) if nodes else ((), ())
+    )
+    edges = list(G.edges(data="weight"))
+    us, vs, weights = zip(*edges) if edges else ((), (), ())
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"node": nodes, "longitude": lons, "latitude": lats}).to_parquet(
+        output_path / "nodes.parquet", index=False
+    )
+    pd.DataFrame({"u": us, "v": vs, "weight": weights}).to_parquet(
+        output_path / "edges.parquet", index=False
+    )
+
+
+def _parquet_positions(nodes):
+    """
+    Reads the node positions from a Parquet graph's nodes table, skipping missing ones.
+    """
+    nodes = nodes.dropna(subset=["longitude", "latitude"])
+    return dict(
+        zip(
+            nodes["node"].tolist(),
+            zip(nodes["longitude"].tolist(), nodes["latitude"].tolist()),
+        )
+    )
+
+
 def load_graph(graph_path="../output/simple_route.pkl"):
     """
-    Loads a previously saved network graph from a pickle file.
+    Loads a previously saved network graph from a pickle file or a Parquet graph directory.
 
     Args:
-        graph_path (str): The file path of the pickle file to load the graph from.
+        graph_path (str): The pickle file or Parquet directory to load the graph from.
 
     Returns:
         networkx.Graph: The loaded graph object.
         None: If the file is not found, returns None.
+
+    Raises:
+        ValueError: If the path has neither a pickle nor a ``.parquet`` suffix.
     """
+    graph_path = Path(graph_path)
+    graph_format = _graph_format(graph_path)
     try:
-        with open(graph_path, "rb") as f:
-            G = pickle.load(f)
+        if graph_format == "pickle":
+            with open(graph_path, "rb") as f:
+                # Pickles saved before compression was added are loaded as they are
+                compressed = f.read(len(ZSTD_MAGIC)) == ZSTD_MAGIC
+                f.seek(0)
+                if compressed:
+                    with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                        G = pickle.load(reader)
+                else:
+                    G = pickle.load(f)
+        else:
+            nodes = pd.read_parquet(graph_path / "nodes.parquet")
+            edges = pd.read_parquet(graph_path / "edges.parquet")
+
+            G = nx.Graph()
+            G.add_nodes_from(nodes["node"].tolist())
+            nx.set_node_attributes(G, _parquet_positions(nodes), "pos")
+            G.add_weighted_edges_from(
+                zip(edges["u"].tolist(), edges["v"].tolist(), edges["weight"].tolist())
+            )
         print(f"Network graph loaded from '{graph_path}'.")
         return G
     except FileNotFoundError:
@@ -73,6 +363,135 @@ def load_graph(graph_path="../output/simple_route.pkl"):
         return None
 
 
+def load_positions(graph_path="../output/simple_route.pkl"):
+    """
+    Loads the node positions of a saved graph without loading the graph itself.
+
+    Pickled graphs read the ``.pos.npz`` file saved next to them, falling back to loading the
+    whole pickle for graphs saved without one, and Parquet graph directories read only their
+    ``nodes.parquet`` table. Nodes without a position are left out.
+
+    Args:
+        graph_path (str): The pickle file or Parquet directory the graph was saved to.
+
+    Returns:
+        dict: A dictionary of (longitude, latitude) node positions keyed by node IDs.
+        None: If the file is not found, returns None.
+
+    Raises:
+        ValueError: If the path has neither a pickle nor a ``.parquet`` suffix.
+    """
+    graph_path = Path(graph_path)
+    graph_format = _graph_format(graph_path)
+    try:
+        if graph_format == "parquet":
+            return _parquet_positions(pd.read_parquet(graph_path / "nodes.parquet"))
+
+        positions_path = _positions_path(graph_path)
+        if not positions_path.exists():
+            G = load_graph(graph_path)
+            return None if G is None else nx.get_node_attributes(G, "pos")
+        with np.load(positions_path) as positions:
+            nodes = positions["node_ids"]
+            lons, lats = positions["lons"], positions["lats"]
+        return dict(zip(nodes.tolist(), zip(lons.tolist(), lats.tolist())))
+    except FileNotFoundError:
+        print(f"Error: Node positions for graph '{graph_path}' not found.")
+        return None
+
+
+def _load_cached(source_path, cache_dir, read_source):
+    """
+    Loads a GeoDataFrame from a Feather cache, rebuilding the cache when its source file is newer.
+
+    Cache files are keyed by a hash of the source's resolved path, so sources with the same file
+    name in different directories are cached separately.
+
+    Args:
+        source_path (str): The file the GeoDataFrame is read from.
+        cache_dir (str): The directory where the Feather cache is kept.
+        read_source (callable): Reads the source file into a GeoDataFrame.
+
+    Returns:
+        geopandas.GeoDataFrame: The loaded GeoDataFrame.
+    """
+    source_path = Path(source_path)
+    key = hashlib.sha1(str(source_path.resolve()).encode()).hexdigest()[:12]
+    cache_path = Path(cache_dir) / f"{key}_{source_path.stem}.feather"
+
+    # Checking the source first keeps a missing file an error even if a cache exists
+    source_mtime = source_path.stat().st_mtime
+    if cache_path.exists() and cache_path.stat().st_mtime >= source_mtime:
+        return gpd.read_feather(cache_path)
+
+    gdf = read_source(source_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    gdf.to_feather(cache_path)
+    return gdf
+
+
+def _read_health_facilities_csv(csv_path):
+    """
+    Reads healthcare facilities from a CSV file and builds their point geometries.
+
+    Args:
+        csv_path (str): The CSV file with 'latitude' and 'longitude' columns.
+
+    Returns:
+        geopandas.GeoDataFrame: The facilities with point geometries.
+    """
+    health_facilities_df = pd.read_csv(csv_path)
+    return gpd.GeoDataFrame(
+        health_facilities_df,
+        geometry=gpd.points_from_xy(
+            health_facilities_df.longitude, health_facilities_df.latitude
+        ),
+        crs="EPSG:4326",
+    )
+
+
+def load_health_facilities(
+    csv_path="../data/accra_facilities_filtered.csv", cache_dir="../cache"
+):
+    """
+    Loads the healthcare facilities as a GeoDataFrame of points.
+
+    The first load writes the GeoDataFrame, geometries included, to a Feather file, so later
+    loads skip parsing the CSV and rebuilding the points until the CSV changes.
+
+    Args:
+        csv_path (str): The CSV file with the healthcare facilities.
+        cache_dir (str): The directory where the Feather cache is kept.
+
+    Returns:
+        geopandas.GeoDataFrame: The healthcare facilities.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    return _load_cached(csv_path, cache_dir, _read_health_facilities_csv)
+
+
+def load_zones(geojson_path, cache_dir="../cache"):
+    """
+    Loads no-fly or avoidance zones from a GeoJSON file, caching them as Feather like
+    load_health_facilities.
+
+    Args:
+        geojson_path (str): The GeoJSON file with the zone polygons.
+        cache_dir (str): The directory where the Feather cache is kept.
+
+    Returns:
+        geopandas.GeoDataFrame: The zones.
+
+    Raises:
+        FileNotFoundError: If the GeoJSON file does not exist.
+    """
+    return _load_cached(
+        geojson_path, cache_dir, lambda path: gpd.read_file(path, engine="pyogrio")
+    )
+
+
 def save_route_to_csv(G, shortest_path, pos, csv_file_path="../output/drone_route.csv"):
     """
     Saves the shortest path route of a drone to a CSV file.
@@ -86,57 +505,133 @@ def save_route_to_csv(G, shortest_path, pos, csv_file_path="../output/drone_rout
     Returns:
         None
     """
-    route_data = []
-
-    # Add start node
-    start_pos = pos[shortest_path[0]]
-    route_data.append(
-        {"label": "Start", "lat": start_pos[1], "longitude": start_pos[0]}
+    # The columns are fixed and the values need no quoting, so each row is formatted
+    # and written as it is generated instead of going through the csv module.
+    # The first and last nodes are the start and end, with charging stations between,
+    # so a one-node route still gets both a start and an end row
+    rows = chain(
+        [("Start", shortest_path[0])],
+        ((f"Charging Station {node}", node) for node in shortest_path[1:-1]),
+        [("End", shortest_path[-1])],
     )
+    with open(csv_file_path, mode="w", newline="", buffering=1024 * 1024) as file:
+        file.write("label,lat,longitude\n")
+        for label, node in rows:
+            lon, lat = pos[node]
+            file.write(f"{label},{lat},{lon}\n")
 
-    # Add intermediate nodes (charging stations)
-    for node in shortest_path[1:-1]:
-        node_pos = pos[node]
-        route_data.append(
-            {
-                "label": f"Charging Station {node}",
-                "lat": node_pos[1],
-                "longitude": node_pos[0],
-            }
-        )
+    print(f"Route data saved to {csv_file_path}")
 
-    # Add end node
-    end_pos = pos[shortest_path[-1]]
-    route_data.append({"label": "End", "lat": end_pos[1], "longitude": end_pos[0]})
 
-    # Write the data to a CSV file
-    with open(csv_file_path, mode="w", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=["label", "lat", "longitude"])
-        writer.writeheader()
-        writer.writerows(route_data)
+def build_path_index(G, weight="weight"):
+    """
+    Flattens a graph into a sparse adjacency matrix for repeated find_shortest_path queries.
 
-    print(f"Route data saved to {csv_file_path}")
+    Building the matrix walks every edge in Python, which costs more than a single NetworkX
+    search, so it only pays off when the same index answers several queries. It must be
+    rebuilt after the graph's nodes, edges or weights change.
 
+    Args:
+        G (networkx.Graph): The graph to index.
+        weight (str): The edge attribute holding the edge weight.
 
-def get_drone_constraints():
+    Returns:
+        tuple: The graph's nodes, a dictionary mapping each node to its matrix row, and the
+        adjacency matrix in CSR format.
+    """
+    nodes = list(G.nodes)
+    node_to_idx = {node: i for i, node in enumerate(nodes)}
+    edges = np.array(
+        [
+            (node_to_idx[u], node_to_idx[v], w)
+            for u, v, w in G.edges(data=weight, default=1)
+        ],
+        dtype=float,
+    ).reshape(-1, 3)
+    adjacency = coo_matrix(
+        (edges[:, 2], (edges[:, 0].astype(int), edges[:, 1].astype(int))),
+        shape=(len(nodes), len(nodes)),
+    ).tocsr()
+    return nodes, node_to_idx, adjacency
+
+
+def find_shortest_path(G, source, target, weight="weight", index=None):
+    """
+    Finds the lowest-weight path between two nodes.
+
+    A one-off query runs NetworkX's Dijkstra, which stops as soon as it reaches the target.
+    Given an index from build_path_index, the search instead runs on its sparse adjacency
+    matrix with SciPy's compiled Dijkstra implementation, which is faster for repeated queries.
+
+    Args:
+        G (networkx.Graph): The graph to search.
+        source: The node to start the path from.
+        target: The node to end the path at.
+        weight (str): The edge attribute holding the edge weight.
+        index (tuple): Optional index of the graph from build_path_index, built with the same weight.
+
+    Returns:
+        list: The nodes on the shortest path, from source to target.
+
+    Raises:
+        networkx.NodeNotFound: If the source or target node is not in the graph.
+        networkx.NetworkXNoPath: If the target cannot be reached from the source.
+    """
+    for node in (source, target):
+        if node not in G:
+            raise nx.NodeNotFound(f"Node {node} is not in the graph.")
+    if index is None:
+        return nx.dijkstra_path(G, source, target, weight=weight)
+
+    nodes, node_to_idx, adjacency = index
+
+    source_idx, target_idx = node_to_idx[source], node_to_idx[target]
+    _, predecessors = dijkstra(
+        adjacency,
+        directed=G.is_directed(),
+        indices=source_idx,
+        return_predecessors=True,
+    )
+    if source_idx != target_idx and predecessors[target_idx] < 0:
+        raise nx.NetworkXNoPath(f"Node {target} not reachable from {source}.")
+
+    # Walk the predecessor array back from the target to rebuild the path
+    path = [target_idx]
+    while path[-1] != source_idx:
+        path.append(predecessors[path[-1]])
+    return [nodes[idx] for idx in reversed(path)]
+
+
+def get_drone_constraints(value=None):
     """
     Prompts the user to input the drone's maximum range and payload capacity, with validation.
 
+    Args:
+        value (tuple): Optional (range in km, payload capacity in kg) to validate instead of
+            prompting the user.
+
     Returns:
         tuple: A tuple containing the validated drone range (in km) and payload capacity (in kg).
+
+    Raises:
+        ValueError: If a given value is not numeric or not positive.
     """
+    if value is not None:
+        drone_range_km, payload_capacity_kg = map(float, value)
+        if drone_range_km <= 0 or payload_capacity_kg <= 0:
+            raise ValueError("Range and payload must be positive numbers.")
+        logging.info(
+            f"Drone constraints set: Range = {drone_range_km} km, Payload Capacity = {payload_capacity_kg} kg"
+        )
+        return drone_range_km, payload_capacity_kg
+
     while True:
         try:
             drone_range_km = float(input("Enter the drone's maximum range (in km): "))
             payload_capacity_kg = float(
                 input("Enter the drone's maximum payload capacity (in kg): ")
             )
-            if drone_range_km <= 0 or payload_capacity_kg <= 0:
-                raise ValueError("Range and payload must be positive numbers.")
-            logging.info(
-                f"Drone constraints set: Range = {drone_range_km} km, Payload Capacity = {payload_capacity_kg} kg"
-            )
-            return drone_range_km, payload_capacity_kg
+            return get_drone_constraints((drone_range_km, payload_capacity_kg))
         except ValueError as e:
             logging.error(f"Invalid input: {e}")
             print("Please enter valid numeric values greater than 0.")
@@ -0,0 +1,144 @@
+"""
+graph_utils.py
+
+This module provides the graph building steps shared by the simple and advanced drone routing
+algorithms. It includes functions for adding healthcare facilities as nodes, finding the edges
+between them, and connecting new nodes to the graph while avoiding no-fly zones.
+
+Functions:
+- add_facility_nodes(G, health_facilities_gdf, no_fly_zones_gdf): Adds the facilities outside no-fly zones as nodes.
+- facility_edges(health_facilities_gdf, no_fly_zones_gdf, drone_range_km, usable, dtype):
+  Finds the straight edges between facilities within range that avoid no-fly zones.
+- allocate_node_id(G): Allocates an unused node ID from a counter kept on the graph.
+- edges_from_point(x, y, node_name, health_facilities_gdf, no_fly_zones_gdf, targets):
+  Builds the straight edges from a new node to facilities, dropping those crossing no-fly zones.
+"""
+
+import numpy as np
+import shapely
+from src.common_route_utils import intersects_mask, pairs_within_range, prepared_union
+
+
+def add_facility_nodes(G, health_facilities_gdf, no_fly_zones_gdf):
+    """
+    Adds the healthcare facilities outside every no-fly zone to a graph as nodes.
+
+    Each node is keyed by the facility's index and positioned at its (longitude, latitude). The
+    graph's node ID counter (see allocate_node_id) is seeded past the largest facility index.
+
+    Args:
+        G (networkx.Graph): The graph to add the nodes to.
+        health_facilities_gdf (geopandas.GeoDataFrame): GeoDataFrame containing healthcare facilities with geometry points.
+        no_fly_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing no-fly zones as polygons.
+
+    Returns:
+        numpy.ndarray: A boolean array, True where the facility lies outside the no-fly zones.
+    """
+    index = health_facilities_gdf.index.tolist()
+    positions = zip(
+        health_facilities_gdf["longitude"].tolist(),
+        health_facilities_gdf["latitude"].tolist(),
+    )
+    geometries = np.asarray(health_facilities_gdf.geometry.values)
+
+    # Test every facility against a single merged no-fly polygon
+    outside_no_fly = ~shapely.contains(prepared_union(no_fly_zones_gdf), geometries)
+    G.add_nodes_from(
+        (node, {"pos": pos})
+        for node, pos, outside in zip(index, positions, outside_no_fly)
+        if outside
+    )
+    G.graph["next_node_id"] = max(index) + 1 if index else 0
+    return outside_no_fly
+
+
+def facility_edges(
+    health_facilities_gdf, no_fly_zones_gdf, drone_range_km, usable, dtype=np.float64
+):
+    """
+    Finds the straight-line edges between healthcare facilities within the drone's range that
+    do not cross a no-fly zone.
+
+    Args:
+        health_facilities_gdf (geopandas.GeoDataFrame): GeoDataFrame containing healthcare facilities with geometry points.
+        no_fly_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing no-fly zones as polygons.
+        drone_range_km (float): The maximum distance the drone can travel between facilities in kilometers.
+        usable (numpy.ndarray): A boolean array, True for the facilities edges may be built from.
+        dtype (numpy.dtype): The precision the facility coordinates are ranged in.
+
+    Returns:
+        tuple: Arrays of the first and second facility positions (i < j) of each edge, the
+        distance between them in kilometers, and the edges as LineStrings.
+    """
+    lats = health_facilities_gdf["latitude"].to_numpy(dtype)
+    lons = health_facilities_gdf["longitude"].to_numpy(dtype)
+    geometries = np.asarray(health_facilities_gdf.geometry.values)
+
+    # Find each unordered pair within the drone's range once, skipping pairs
+    # where either facility is not usable
+    ii, jj, distances = pairs_within_range(lats, lons, drone_range_km)
+    keep = usable[ii] & usable[jj]
+    ii, jj, distances = ii[keep], jj[keep], distances[keep]
+
+    # Build every candidate edge at once and drop those crossing a no-fly zone
+    coords = shapely.get_coordinates(geometries)
+    lines = shapely.linestrings(np.stack([coords[ii], coords[jj]], axis=1))
+    clear = ~intersects_mask(no_fly_zones_gdf, lines)
+    return ii[clear], jj[clear], distances[clear], lines[clear]
+
+
+def allocate_node_id(G):
+    """
+    Allocates the next unused node ID of a graph.
+
+    IDs come from a counter kept on the graph, so the nodes are only scanned for graphs that
+    were saved without one.
+
+    Args:
+        G (networkx.Graph): The graph to allocate the ID in.
+
+    Returns:
+        int: The allocated node ID.
+    """
+    if "next_node_id" not in G.graph:
+        G.graph["next_node_id"] = max(G.nodes) + 1 if len(G.nodes) > 0 else 0
+    node_id = G.graph["next_node_id"]
+    G.graph["next_node_id"] += 1
+    return node_id
+
+
+def edges_from_point(x, y, node_name, health_facilities_gdf, no_fly_zones_gdf, targets):
+    """
+    Builds the straight-line edges from a new node to the given healthcare facilities, dropping
+    and reporting those that cross a no-fly zone.
+
+    Args:
+        x (float): The x coordinate of the new node, in the facilities' CRS.
+        y (float): The y coordinate of the new node, in the facilities' CRS.
+        node_name (str): The name/label of the new node, used in the messages printed.
+        health_facilities_gdf (geopandas.GeoDataFrame): GeoDataFrame containing healthcare facilities with geometry points.
+        no_fly_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing no-fly zones as polygons.
+        targets (numpy.ndarray): The positions of the facilities to connect the new node to.
+
+    Returns:
+        tuple: The positions of the facilities that can be connected, and their edges as LineStrings.
+    """
+    # Build the candidate edges and check them against the no-fly zones in one go
+    facility_coords = shapely.get_coordinates(
+        np.asarray(health_facilities_gdf.geometry.values)[targets]
+    )
+    lines = shapely.linestrings(
+        np.stack(
+            [np.broadcast_to([x, y], facility_coords.shape), facility_coords],
+            axis=1,
+        )
+    )
+    crosses_no_fly = intersects_mask(no_fly_zones_gdf, lines)
+
+    names = health_facilities_gdf["name"].tolist()
+    for i in targets[crosses_no_fly]:
+        print(
+            f"Edge from {node_name} to {names[i]} intersects a no-fly zone, not adding."
+        )
+
+    return targets[~crosses_no_fly], lines[~crosses_no_fly]
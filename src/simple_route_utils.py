@@ -13,9 +13,19 @@ Functions:
 """
 
 import networkx as nx
-from shapely.geometry import Point, LineString
-from geopy.distance import geodesic
-import pickle
+import numpy as np
+from shapely.geometry import Point
+from src.common_route_utils import (
+    haversine_km,
+    intersects_mask,
+    save_graph,
+)
+from src.graph_utils import (
+    add_facility_nodes,
+    allocate_node_id,
+    edges_from_point,
+    facility_edges,
+)
 
 
 def create_and_save_graph(
@@ -36,42 +46,31 @@ def create_and_save_graph(
         no_fly_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing no-fly zones as polygons.
         avoidance_zones_gdf (geopandas.GeoDataFrame): GeoDataFrame containing avoidance zones as polygons.
         drone_range_km (float): The maximum distance the drone can travel between facilities in kilometers.
-        output_path (str): The file path where the graph will be saved as a pickle file.
+        output_path (str): The pickle file or Parquet directory the graph will be saved to (see save_graph).
 
     Returns:
         None
     """
     G = nx.Graph()
 
-    # Add healthcare facilities as nodes and connect them if they are within the drone's range
-    for idx1, row1 in health_facilities_gdf.iterrows():
-        if not no_fly_zones_gdf.contains(row1.geometry).any():
-            G.add_node(idx1, pos=(row1["longitude"], row1["latitude"]))
-
-            for idx2, row2 in health_facilities_gdf.iterrows():
-                if idx1 != idx2:
-                    distance = geodesic(
-                        (row1["latitude"], row1["longitude"]),
-                        (row2["latitude"], row2["longitude"]),
-                    ).km
-
-                    if distance <= drone_range_km:
-                        line = LineString([row1.geometry, row2.geometry])
-
-                        # Check if the edge intersects any no-fly zones
-                        if no_fly_zones_gdf.intersects(line).any():
-                            continue  # Skip adding this edge
-
-                        # Adjust the edge weight if it intersects an avoidance zone
-                        edge_weight = distance
-                        if avoidance_zones_gdf.intersects(line).any():
-                            edge_weight *= 10
-
-                        G.add_edge(idx1, idx2, weight=edge_weight)
+    # Add healthcare facilities outside the no-fly zones as nodes, and join those in range
+    outside_no_fly = add_facility_nodes(G, health_facilities_gdf, no_fly_zones_gdf)
+    ii, jj, distances, lines = facility_edges(
+        health_facilities_gdf, no_fly_zones_gdf, drone_range_km, outside_no_fly
+    )
+
+    # Adjust the edge weights of those intersecting an avoidance zone
+    edge_weights = distances * np.where(
+        intersects_mask(avoidance_zones_gdf, lines), 10, 1
+    )
+    index = health_facilities_gdf.index.tolist()
+    G.add_weighted_edges_from(
+        (index[i], index[j], edge_weight)
+        for i, j, edge_weight in zip(ii, jj, edge_weights.tolist())
+    )
 
     # Save the graph to a file
-    with open(output_path, "wb") as f:
-        pickle.dump(G, f)
+    save_graph(G, output_path)
     print(f"Network graph created and saved as '{output_path}'.")
 
 
@@ -104,37 +103,34 @@ def add_node_to_graph(
         None: If the node is within a no-fly zone and cannot be added.
     """
     point = Point(lon, lat)
-    if no_fly_zones_gdf.contains(point).any():
+    # The spatial index narrows the test to the zones around the point
+    if no_fly_zones_gdf.sindex.query(point, predicate="within").size:
         print(f"{node_name} is within a no-fly zone and cannot be added.")
         return None
 
-    # Ensure unique node index
-    new_node_idx = max(G.nodes) + 1 if len(G.nodes) > 0 else 0
+    new_node_idx = allocate_node_id(G)
     G.add_node(new_node_idx, pos=(lon, lat), name=node_name)
 
-    # Ensure the position is stored in the graph's 'pos' attribute
-    pos = nx.get_node_attributes(G, "pos")
-    pos[new_node_idx] = (lon, lat)
-    nx.set_node_attributes(G, pos, "pos")
-
-    # Add edges to other nodes within range
-    for idx, row in health_facilities_gdf.iterrows():
-        distance = geodesic((lat, lon), (row["latitude"], row["longitude"])).km
-        if distance <= drone_range_km:
-            edge_weight = distance
-            line = LineString([point, row.geometry])
-
-            # Check if the edge intersects any no-fly zones
-            if no_fly_zones_gdf.intersects(line).any():
-                print(
-                    f"Edge from {node_name} to {row['name']} intersects a no-fly zone, not adding."
-                )
-                continue  # Skip adding this edge
-
-            # If it intersects an avoidance zone, increase weight
-            if avoidance_zones_gdf.intersects(line).any():
-                edge_weight *= 3  # Increase the weight significantly if it intersects an avoidance zone
-
-            G.add_edge(new_node_idx, idx, weight=edge_weight)
+    # Measure the distance to every facility at once, then only check those within range
+    distances = haversine_km(
+        lat,
+        lon,
+        health_facilities_gdf["latitude"].to_numpy(),
+        health_facilities_gdf["longitude"].to_numpy(),
+    )
+    in_range = np.flatnonzero(distances <= drone_range_km)
+    targets, lines = edges_from_point(
+        lon, lat, node_name, health_facilities_gdf, no_fly_zones_gdf, in_range
+    )
+
+    # Increase the weight significantly for edges crossing an avoidance zone
+    edge_weights = distances[targets] * np.where(
+        intersects_mask(avoidance_zones_gdf, lines), 3, 1
+    )
+    index = health_facilities_gdf.index.tolist()
+    G.add_weighted_edges_from(
+        (new_node_idx, index[i], edge_weight)
+        for i, edge_weight in zip(targets, edge_weights.tolist())
+    )
 
     return new_node_idx
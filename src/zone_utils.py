@@ -1,11 +1,31 @@
+from functools import lru_cache
 import osmnx as ox
 import geopandas as gpd
+import numpy as np
+import shapely
+from pyproj import Transformer
 from shapely.geometry import Point
 import matplotlib.pyplot as plt
 import os
 import glob
 
 
+@lru_cache(maxsize=None)
+def _aeqd_to_lonlat(lat, lon):
+    """
+    Create a transformer from an azimuthal equidistant projection centred on a point to longitude/latitude.
+
+    Parameters:
+    lat (float): Latitude of the projection's centre.
+    lon (float): Longitude of the projection's centre.
+
+    Returns:
+    pyproj.Transformer: Transformer from the projection's meters to longitude/latitude.
+    """
+    aeqd = f"+proj=aeqd +lat_0={lat} +lon_0={lon} +datum=WGS84 +units=m"
+    return Transformer.from_crs(aeqd, "EPSG:4326", always_xy=True)
+
+
 def create_circular_zone(lat, lon, radius):
     """
     Create a circular polygon around a point defined by latitude and longitude.
@@ -18,9 +38,13 @@ def create_circular_zone(lat, lon, radius):
     Returns:
     shapely.geometry.polygon.Polygon: Circular polygon around the given point.
     """
-    return Point(lon, lat).buffer(
-        radius / 111320
-    )  # Convert meters to degrees (approximation)
+    # Distances from the centre of an azimuthal equidistant projection are true to scale,
+    # so buffer its origin in meters and project the circle back to longitude/latitude
+    transformer = _aeqd_to_lonlat(lat, lon)
+    return shapely.transform(
+        Point(0, 0).buffer(radius),
+        lambda coords: np.column_stack(transformer.transform(*coords.T)),
+    )
 
 
 def create_zones_gdf(zones):
@@ -0,0 +1,295 @@
+import sys
+import os
+
+# Get the directory of the current script
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+
+import types
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pytest
+from shapely.geometry import LineString, Point, Polygon
+from pyproj import Geod
+from src.advanced_route_utils import (
+    _search_box,
+    add_node_to_graph,
+    calculate_edge_weights,
+    calculate_segment_weight,
+    create_and_save_graph,
+    download_land_use_data,
+    prune_path,
+    segment_edge,
+)
+from src.common_route_utils import EARTH_RADIUS_KM, haversine_km, load_graph
+from tests.utils import (
+    create_test_graph,
+    mock_accra_facilities,
+    mock_accra_land_use,
+    mock_accra_zones,
+)
+
+
+def prune_with_zones(path, G, no_fly_gdf, drone_range_km, avoidance_gdf=None, crs=None):
+    empty = gpd.GeoDataFrame(geometry=[], crs=crs)
+    if avoidance_gdf is None:
+        avoidance_gdf = empty
+    return prune_path(
+        path, G, empty, empty, empty, no_fly_gdf, avoidance_gdf, drone_range_km
+    )
+
+
+def test_prune_path_skips_feasible_waypoints():
+    G = create_test_graph()
+    no_fly_gdf = gpd.GeoDataFrame(geometry=[])
+    assert prune_with_zones([0, 1, 2, 3], G, no_fly_gdf, 20) == [0, 3]
+
+
+def test_prune_path_respects_drone_range():
+    G = create_test_graph()
+    no_fly_gdf = gpd.GeoDataFrame(geometry=[])
+    # Node 0 to node 2 is about 8.3 km, while node 0 to node 3 is about 13 km
+    assert prune_with_zones([0, 1, 2, 3], G, no_fly_gdf, 8.3) == [0, 2, 3]
+
+
+def test_prune_path_avoids_no_fly_zones():
+    G = create_test_graph()
+    # A small zone that blocks the shortcuts from node 0 but not its first hop
+    no_fly_zone = Polygon(
+        [(-0.172, 5.590), (-0.168, 5.590), (-0.168, 5.600), (-0.172, 5.600)]
+    )
+    no_fly_gdf = gpd.GeoDataFrame(geometry=[no_fly_zone])
+    assert prune_with_zones([0, 1, 2, 3], G, no_fly_gdf, 20) == [0, 1, 3]
+
+
+def test_prune_path_keeps_detours_around_avoidance_zones():
+    # A route that detours north around an avoidance zone sitting on the direct line
+    crs = "EPSG:32630"
+    G = nx.Graph()
+    G.add_node(0, pos=(-0.20, 5.60))
+    G.add_node(1, pos=(-0.18, 5.62))
+    G.add_node(2, pos=(-0.16, 5.60))
+    positions = gpd.GeoSeries(
+        [Point(G.nodes[node]["pos"]) for node in G.nodes], crs="EPSG:4326"
+    ).to_crs(crs)
+    avoidance_gdf = gpd.GeoDataFrame(
+        geometry=[LineString([positions[0], positions[2]]).centroid.buffer(1000)],
+        crs=crs,
+    )
+    empty = gpd.GeoDataFrame(geometry=[], crs=crs)
+    for u, v in [(0, 1), (1, 2)]:
+        leg = np.array([LineString([positions[u], positions[v]])], dtype=object)
+        weight = calculate_edge_weights(leg, empty, empty, empty, avoidance_gdf)[0]
+        G.add_edge(u, v, weight=weight)
+
+    # The direct flight is shorter, but costs more once weighted for the avoidance zone
+    assert prune_with_zones([0, 1, 2], G, empty, 20, crs=crs) == [0, 2]
+    assert prune_with_zones([0, 1, 2], G, empty, 20, avoidance_gdf, crs) == [0, 1, 2]
+
+
+def mock_land_use():
+    # Square layers in plain planar units, each overlapping part of the test lines
+    def square(x, y, size):
+        return Polygon([(x, y), (x + size, y), (x + size, y + size), (x, y + size)])
+
+    roads_gdf = gpd.GeoDataFrame(geometry=[LineString([(25, -50), (25, 50)])])
+    buildings_gdf = gpd.GeoDataFrame(geometry=[square(40, -5, 10)])
+    open_space_gdf = gpd.GeoDataFrame(geometry=[square(60, -20, 30), square(0, 30, 20)])
+    avoidance_gdf = gpd.GeoDataFrame(geometry=[square(-10, 15, 20)])
+    return roads_gdf, buildings_gdf, open_space_gdf, avoidance_gdf
+
+
+def summed_segment_weights(lines, land_use, segment_length):
+    return [
+        sum(
+            calculate_segment_weight(segment, *land_use)
+            for segment in segment_edge(line, segment_length)
+        )
+        for line in lines
+    ]
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        # Straight lines, including ones shorter than a segment
+        [
+            LineString([(0, 0), (100, 0)]),
+            LineString([(0, 20), (3, 24)]),
+            LineString([(100, 10), (0, 30)]),
+            LineString([(5, -40), (5, 45)]),
+        ],
+        # Multi-vertex lines mixed with straight and short ones
+        [
+            LineString([(0, 0), (50, 0), (50, 40), (0, 40)]),
+            LineString([(0, 0), (100, 0)]),
+            LineString([(0, 0), (2, 2), (4, 0)]),
+            LineString([(90, 0), (60, -10), (-10, 20)]),
+        ],
+    ],
+)
+def test_calculate_edge_weights_matches_segment_weights(lines):
+    land_use = mock_land_use()
+    lines = np.array(lines, dtype=object)
+    weights = calculate_edge_weights(lines, *land_use, segment_length=10)
+    assert weights.tolist() == pytest.approx(
+        summed_segment_weights(lines, land_use, 10)
+    )
+
+
+def test_calculate_edge_weights_empty():
+    weights = calculate_edge_weights(
+        np.empty(0, dtype=object), *mock_land_use(), segment_length=10
+    )
+    assert weights.shape == (0,)
+
+
+def mock_osmnx(calls):
+    # Stands in for osmnx, returning small square layers and recording each query
+    def layer(x, count=1):
+        square = Polygon([(x, 0), (x + 1, 0), (x + 1, 1), (x, 1)])
+        return gpd.GeoDataFrame({"name": ["osm"] * count}, geometry=[square] * count)
+
+    def graph_from_place(place_name, network_type):
+        calls.append(("graph", place_name, network_type))
+        return "road graph"
+
+    def graph_to_gdfs(G, nodes, edges):
+        assert (G, nodes, edges) == ("road graph", False, True)
+        return layer(0)
+
+    def features_from_place(place_name, tags):
+        calls.append(("features", place_name, tags))
+        return layer(1, count=2) if "building" in tags else layer(2)
+
+    return types.SimpleNamespace(
+        graph_from_place=graph_from_place,
+        graph_to_gdfs=graph_to_gdfs,
+        features_from_place=features_from_place,
+    )
+
+
+def test_download_land_use_data_caches(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setitem(sys.modules, "osmnx", mock_osmnx(calls))
+    roads, buildings, open_space = download_land_use_data("Testville", tmp_path)
+    assert sorted(calls, key=str) == [
+        ("features", "Testville", {"building": True}),
+        ("features", "Testville", {"leisure": "park"}),
+        ("graph", "Testville", "drive"),
+    ]
+    assert [
+        gdf.geometry.bounds.minx.tolist() for gdf in (roads, buildings, open_space)
+    ] == [
+        [0],
+        [1, 1],
+        [2],
+    ]
+    assert list(roads.columns) == ["geometry"]
+
+    # A second call is served from the cache without importing osmnx
+    monkeypatch.setitem(sys.modules, "osmnx", None)
+    cached = download_land_use_data("Testville", tmp_path)
+    for gdf, cached_gdf in zip((roads, buildings, open_space), cached):
+        assert cached_gdf.geometry.equals(gdf.geometry)
+
+
+def projected_accra_layers():
+    # Facilities, roads, buildings, open spaces, no-fly and avoidance zones in local UTM
+    facilities = mock_accra_facilities()
+    utm_crs = facilities.estimate_utm_crs()
+    layers = (facilities, *mock_accra_land_use(), *mock_accra_zones())
+    return utm_crs, [gdf.to_crs(utm_crs) for gdf in layers]
+
+
+def brute_force_weight(line, roads, buildings, open_space, avoidance):
+    return sum(
+        calculate_segment_weight(segment, roads, buildings, open_space, avoidance)
+        for segment in segment_edge(line)
+    )
+
+
+def test_search_box_contains_search_area():
+    utm_crs, _ = projected_accra_layers()
+    lat, lon, distance_km = 5.6, -0.18, 4
+    azimuths = np.linspace(0, 360, 73)
+    # Ranges are haversine distances, so trace the search circle on the same sphere,
+    # just inside the distance so points on the box's edge are not lost to rounding
+    sphere = Geod(a=EARTH_RADIUS_KM * 1000, f=0)
+    circle_lons, circle_lats, _ = sphere.fwd(
+        np.full_like(azimuths, lon),
+        np.full_like(azimuths, lat),
+        azimuths,
+        np.full_like(azimuths, distance_km * 999.999),
+    )
+    circle = gpd.GeoSeries(gpd.points_from_xy(circle_lons, circle_lats), crs=4326)
+    for crs in (None, utm_crs):
+        points = circle if crs is None else circle.to_crs(crs)
+        assert points.covered_by(_search_box(lat, lon, distance_km, crs)).all()
+
+
+def test_add_node_to_graph_matches_brute_force():
+    utm_crs, layers = projected_accra_layers()
+    facilities, roads, buildings, open_space, no_fly, avoidance = layers
+    G = nx.Graph()
+    for lat, lon in [(5.59, -0.19), (5.62, -0.13)]:
+        node = add_node_to_graph(G, lat, lon, "Start", *layers, 4)
+        assert G.nodes[node]["pos"] == (lon, lat)
+
+        # Check every facility's distance and no-fly crossing, projecting independently
+        point = gpd.GeoSeries([Point(lon, lat)], crs=4326).to_crs(utm_crs)[0]
+        expected = {}
+        for facility, row in facilities.iterrows():
+            line = LineString([point, row.geometry])
+            distance = haversine_km(lat, lon, row.latitude, row.longitude)
+            if distance <= 4 and not no_fly.intersects(line).any():
+                expected[facility] = brute_force_weight(
+                    line, roads, buildings, open_space, avoidance
+                )
+
+        weights = {other: G.edges[node, other]["weight"] for other in G[node]}
+        assert 0 < len(expected) < len(facilities)
+        assert weights == pytest.approx(expected)
+
+    # A point inside the no-fly zone is not added
+    assert add_node_to_graph(G, 5.60, -0.17, "End", *layers, 4) is None
+
+
+def test_create_and_save_graph_matches_brute_force(tmp_path):
+    _, layers = projected_accra_layers()
+    facilities, roads, buildings, open_space, no_fly, avoidance = layers
+    create_and_save_graph(
+        facilities,
+        roads,
+        buildings,
+        open_space,
+        no_fly,
+        avoidance,
+        3,
+        tmp_path / "g.parquet",
+    )
+    G = load_graph(tmp_path / "g.parquet")
+
+    outside = [
+        i
+        for i, point in facilities.geometry.items()
+        if not no_fly.contains(point).any()
+    ]
+    expected = {}
+    for i in outside:
+        for j in outside:
+            a, b = facilities.loc[i], facilities.loc[j]
+            line = LineString([a.geometry, b.geometry])
+            distance = haversine_km(a.latitude, a.longitude, b.latitude, b.longitude)
+            if i < j and distance <= 3 and not no_fly.intersects(line).any():
+                expected[(i, j)] = brute_force_weight(
+                    line, roads, buildings, open_space, avoidance
+                )
+
+    assert list(G.nodes) == outside
+    assert len(outside) < len(facilities)
+    assert nx.get_edge_attributes(G, "weight") == pytest.approx(expected)
@@ -8,13 +8,54 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
 
 
+import glob
+import geopandas as gpd
 import networkx as nx
 import pandas as pd
 import pickle
-from src.common_route_utils import save_route_to_csv
+import shutil
+import numpy as np
+import pytest
+from shapely.geometry import box
+from src.common_route_utils import (
+    save_route_to_csv,
+    find_shortest_path,
+    build_path_index,
+    haversine_km,
+    pairs_within_range,
+    save_graph,
+    load_graph,
+    load_health_facilities,
+    load_positions,
+    load_zones,
+    get_coordinates,
+    get_drone_constraints,
+)
 from tests.utils import create_test_graph
 
 
+def test_haversine_km():
+    # One degree along the equator is 1/360th of the Earth's circumference
+    assert haversine_km(0, 0, 0, 1) == pytest.approx(111.195, abs=1e-3)
+    distances = haversine_km(
+        5.58, -0.13, np.array([5.58, 5.60]), np.array([-0.13, -0.15])
+    )
+    assert distances[0] == 0
+    assert distances[1] == pytest.approx(3.1, abs=0.05)
+
+
+def test_pairs_within_range():
+    lats = np.array([5.58, 5.60, 5.62, 5.58])
+    lons = np.array([-0.13, -0.15, -0.17, -0.13])
+    distances = haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+    expected_i, expected_j = np.where(np.triu(distances <= 3.5, k=1))
+    for block_size in (1, 3, 1024):
+        ii, jj, dd = pairs_within_range(lats, lons, 3.5, block_size)
+        assert ii.tolist() == expected_i.tolist()
+        assert jj.tolist() == expected_j.tolist()
+        assert dd.tolist() == distances[expected_i, expected_j].tolist()
+
+
 def test_load_graph():
     G = create_test_graph()
     with open("../output/test_graph.gpickle", "wb") as f:
@@ -22,9 +63,112 @@ def test_load_graph():
     with open("../output/test_graph.gpickle", "rb") as f:
         loaded_G = pickle.load(f)
     assert len(loaded_G.nodes) == len(G.nodes)
+    assert nx.utils.graphs_equal(load_graph("../output/test_graph.gpickle"), G)
     os.remove("../output/test_graph.gpickle")
 
 
+def test_graph_path_suffixes():
+    G = create_test_graph()
+    save_graph(G, "../output/test_graph.pickle")
+    assert os.path.isfile("../output/test_graph.pickle")
+    assert nx.utils.graphs_equal(load_graph("../output/test_graph.pickle"), G)
+    os.remove("../output/test_graph.pickle")
+    os.remove("../output/test_graph.pickle.pos.npz")
+
+    with pytest.raises(ValueError):
+        save_graph(G, "../output/test_graph")
+    with pytest.raises(ValueError):
+        load_graph("../output/test_graph.txt")
+    assert not os.path.exists("../output/test_graph")
+
+
+def test_save_and_load_compressed_graph():
+    G = create_test_graph()
+    save_graph(G, "../output/test_graph.pkl")
+    with open("../output/test_graph.pkl", "rb") as f:
+        assert f.read(4) == b"\x28\xb5\x2f\xfd"
+    assert nx.utils.graphs_equal(load_graph("../output/test_graph.pkl"), G)
+
+    # Plain pickles written before compression was added still load
+    with open("../output/test_graph.pkl", "wb") as f:
+        pickle.dump(G, f)
+    assert nx.utils.graphs_equal(load_graph("../output/test_graph.pkl"), G)
+    os.remove("../output/test_graph.pkl")
+    os.remove("../output/test_graph.pkl.pos.npz")
+
+
+def test_load_positions():
+    G = create_test_graph()
+    pos = nx.get_node_attributes(G, "pos")
+    save_graph(G, "../output/test_graph.pkl")
+    save_graph(G, "../output/test_graph.parquet")
+    assert load_positions("../output/test_graph.pkl") == pos
+    assert load_positions("../output/test_graph.parquet") == pos
+    os.remove("../output/test_graph.pkl")
+    os.remove("../output/test_graph.pkl.pos.npz")
+    shutil.rmtree("../output/test_graph.parquet")
+
+
+def test_save_graph_without_all_positions():
+    # Nodes without positions and IDs that are not integers never block the pickle
+    G = create_test_graph()
+    G.add_node(4)
+    for graph_path in ("../output/test_graph.pkl", "../output/test_graph.parquet"):
+        save_graph(G, graph_path)
+        assert load_positions(graph_path) == nx.get_node_attributes(G, "pos")
+        assert list(load_graph(graph_path).nodes) == list(G.nodes)
+
+    G.add_node("x", pos=(-0.2, 5.6))
+    save_graph(G, "../output/test_graph.pkl")
+    assert nx.utils.graphs_equal(load_graph("../output/test_graph.pkl"), G)
+    assert not os.path.exists("../output/test_graph.pkl.pos.npz")
+    assert load_positions("../output/test_graph.pkl") == nx.get_node_attributes(
+        G, "pos"
+    )
+    os.remove("../output/test_graph.pkl")
+    shutil.rmtree("../output/test_graph.parquet")
+
+
+def test_save_and_load_parquet_graph():
+    G = create_test_graph()
+    save_graph(G, "../output/test_graph.parquet")
+    loaded_G = load_graph("../output/test_graph.parquet")
+    assert list(loaded_G.nodes) == list(G.nodes)
+    assert nx.get_node_attributes(loaded_G, "pos") == nx.get_node_attributes(G, "pos")
+    assert nx.get_edge_attributes(loaded_G, "weight") == nx.get_edge_attributes(
+        G, "weight"
+    )
+    shutil.rmtree("../output/test_graph.parquet")
+
+
+def test_load_health_facilities_cache():
+    facilities = load_health_facilities(cache_dir="../output/test_cache")
+    assert (
+        len(glob.glob("../output/test_cache/*_accra_facilities_filtered.feather")) == 1
+    )
+    cached = load_health_facilities(cache_dir="../output/test_cache")
+    assert cached.equals(facilities)
+    assert cached.geometry.x.tolist() == facilities["longitude"].tolist()
+    shutil.rmtree("../output/test_cache")
+
+
+def test_load_zones_cache_same_file_name():
+    # Two sources sharing a file name must not share a cache entry
+    zones = {"a": [box(0, 0, 1, 1)], "b": [box(0, 0, 1, 1), box(2, 2, 3, 3)]}
+    for name, geometries in zones.items():
+        os.makedirs(f"../output/test_zones/{name}", exist_ok=True)
+        gpd.GeoDataFrame(geometry=geometries, crs="EPSG:4326").to_file(
+            f"../output/test_zones/{name}/zones.geojson"
+        )
+    for name in ("b", "a", "b"):
+        loaded = load_zones(
+            f"../output/test_zones/{name}/zones.geojson",
+            cache_dir="../output/test_zones/cache",
+        )
+        assert len(loaded) == len(zones[name])
+    shutil.rmtree("../output/test_zones")
+
+
 def test_save_route_to_csv():
     G = create_test_graph()
     pos = nx.get_node_attributes(G, "pos")
@@ -32,3 +176,49 @@ def test_save_route_to_csv():
     df = pd.read_csv("../output/test_route.csv")
     assert len(df) == 4
     os.remove("../output/test_route.csv")
+
+
+def test_save_route_to_csv_single_node():
+    # A route that starts where it ends still has both a start and an end row
+    G = create_test_graph()
+    pos = nx.get_node_attributes(G, "pos")
+    save_route_to_csv(G, [2], pos, "../output/test_route.csv")
+    df = pd.read_csv("../output/test_route.csv")
+    assert df["label"].tolist() == ["Start", "End"]
+    assert df["lat"].tolist() == [pos[2][1]] * 2
+    os.remove("../output/test_route.csv")
+
+
+def test_find_shortest_path():
+    G = create_test_graph()
+    G.add_edge(0, 3, weight=50)
+    index = build_path_index(G)
+    for path_index in (None, index):
+        assert find_shortest_path(G, 0, 3, index=path_index) == [0, 1, 2, 3]
+        assert find_shortest_path(G, 2, 2, index=path_index) == [2]
+    G.add_edge(0, 3, weight=5)
+    assert find_shortest_path(G, 0, 3, index=build_path_index(G)) == [0, 3]
+
+
+def test_find_shortest_path_no_path():
+    G = create_test_graph()
+    G.add_node(4, pos=(-0.2, 5.6))
+    index = build_path_index(G)
+    for path_index in (None, index):
+        with pytest.raises(nx.NetworkXNoPath):
+            find_shortest_path(G, 0, 4, index=path_index)
+        with pytest.raises(nx.NodeNotFound):
+            find_shortest_path(G, 0, 5, index=path_index)
+
+
+def test_get_coordinates_value():
+    lat_range, lon_range = (5.47, 5.89), (-0.24, -0.02)
+    assert get_coordinates(lat_range, lon_range, ("5.6", -0.2)) == (5.6, -0.2)
+    with pytest.raises(ValueError):
+        get_coordinates(lat_range, lon_range, (6.0, -0.2))
+
+
+def test_get_drone_constraints_value():
+    assert get_drone_constraints((7, "1.5")) == (7.0, 1.5)
+    with pytest.raises(ValueError):
+        get_drone_constraints((0, 1.5))
@@ -1,8 +1,10 @@
 from unittest.mock import patch
 import os
 import pandas as pd
+from scripts import generate_advanced_route
 from scripts.generate_simple_route import main as simple_route_main
 from scripts.generate_advanced_route import main as advanced_route_main
+from tests.utils import mock_accra_land_use
 
 
 @patch(
@@ -45,19 +47,26 @@ def test_simple_route(mock_input):
         "-0.235185096524191",
     ],
 )
-def test_advanced_route(mock_input):
-    # Run the advanced route generation
+def test_advanced_route(mock_input, monkeypatch, tmp_path):
+    # Run the advanced route generation on synthetic land use instead of downloading it,
+    # writing the graph and route to a temporary directory
+    monkeypatch.setattr(
+        generate_advanced_route,
+        "download_land_use_data",
+        lambda place_name: mock_accra_land_use(),
+    )
+    monkeypatch.setattr(generate_advanced_route, "output_dir", str(tmp_path))
     advanced_route_main()
     # Validate the generated route
-    assert os.path.exists("../output/advanced_drone_route.csv")
-    df = pd.read_csv("../output/advanced_drone_route.csv")
+    assert os.path.exists(tmp_path / "advanced_route.parquet")
+    df = pd.read_csv(tmp_path / "advanced_drone_route.csv")
     expected_route = [
         ("Start", 5.576227677008859, -0.137573559298005),
         ("Charging Station 6", 5.584336246319907, -0.162356835325312),
-        ("Charging Station 4", 5.590430560479291, -0.203872904657914),
+        ("Charging Station 204", 5.590547823304689, -0.181442428851426),
+        ("Charging Station 139", 5.611922849863589, -0.203249626337936),
         ("End", 5.643041503585579, -0.235185096524191),
     ]
+    assert len(df) == len(expected_route)
     for idx, row in df.iterrows():
         assert (row["label"], row["lat"], row["longitude"]) == expected_route[idx]
-    # Optionally keep or remove the file after validation
-    os.remove("../output/advanced_drone_route.csv")
@@ -0,0 +1,41 @@
+import sys
+import os
+
+# Get the directory of the current script
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+
+import networkx as nx
+import pytest
+from src.common_route_utils import haversine_km
+from src.graph_utils import add_facility_nodes, allocate_node_id, facility_edges
+from tests.utils import create_test_graph, mock_healthcare_facilities, mock_zones
+
+
+def test_add_facility_nodes_and_edges():
+    facilities = mock_healthcare_facilities()
+    no_fly_gdf, _ = mock_zones()
+    G = nx.Graph()
+    # Facility 2 lies inside the no-fly zone, which blocks the edge between the other two
+    usable = add_facility_nodes(G, facilities, no_fly_gdf)
+    assert usable.tolist() == [True, False, True]
+    assert list(G.nodes) == [0, 2]
+    assert G.nodes[2]["pos"] == (-0.17, 5.62)
+    ii, jj, distances, lines = facility_edges(facilities, no_fly_gdf, 10, usable)
+    assert len(ii) == len(jj) == len(distances) == len(lines) == 0
+
+    ii, jj, distances, lines = facility_edges(
+        facilities, no_fly_gdf.iloc[:0], 10, usable
+    )
+    assert (ii.tolist(), jj.tolist()) == ([0], [2])
+    assert distances[0] == pytest.approx(haversine_km(5.58, -0.13, 5.62, -0.17))
+
+
+def test_allocate_node_id():
+    G = create_test_graph()
+    assert [allocate_node_id(G), allocate_node_id(G)] == [4, 5]
+    G.remove_node(3)
+    assert allocate_node_id(G) == 6
@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Get the directory of the current script
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+
+import warnings
+import numpy as np
+import shapely
+from pyproj import Geod
+from src.zone_utils import create_circular_zone
+
+
+def test_create_circular_zone_radius():
+    lat, lon, radius = 5.6, -0.18, 750
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        zone = create_circular_zone(lat, lon, radius)
+
+    # Every vertex lies the radius away from the centre on the WGS84 ellipsoid
+    lons, lats = shapely.get_coordinates(zone.exterior).T
+    _, _, distances = Geod(ellps="WGS84").inv(
+        np.full_like(lons, lon), np.full_like(lats, lat), lons, lats
+    )
+    assert np.abs(distances - radius).max() < 1e-3
+    assert zone.contains(shapely.Point(lon, lat))
@@ -1,8 +1,9 @@
 # tests/utils.py
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 import networkx as nx
-from shapely.geometry import Polygon
+from shapely.geometry import LineString, Point, Polygon, box
 
 
 def mock_healthcare_facilities():
@@ -40,3 +41,48 @@ def create_test_graph():
     G.add_edge(1, 2, weight=10)
     G.add_edge(2, 3, weight=10)
     return G
+
+
+def mock_accra_facilities(count=40, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "name": [f"Facility {i}" for i in range(count)],
+            "latitude": rng.uniform(5.55, 5.65, count),
+            "longitude": rng.uniform(-0.25, -0.10, count),
+        }
+    )
+    return gpd.GeoDataFrame(
+        df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs="EPSG:4326"
+    )
+
+
+def mock_accra_zones():
+    no_fly_gdf = gpd.GeoDataFrame(
+        geometry=[Point(-0.17, 5.60).buffer(0.012)], crs="EPSG:4326"
+    )
+    avoidance_gdf = gpd.GeoDataFrame(
+        geometry=[Point(-0.21, 5.58).buffer(0.015), Point(-0.12, 5.63).buffer(0.01)],
+        crs="EPSG:4326",
+    )
+    return no_fly_gdf, avoidance_gdf
+
+
+def mock_accra_land_use():
+    # A street grid, a few blocks of buildings and two parks around central Accra
+    streets = [LineString([(-0.26, lat), (-0.09, lat)]) for lat in (5.57, 5.61)]
+    avenues = [LineString([(lon, 5.54), (lon, 5.66)]) for lon in (-0.22, -0.15)]
+    roads_gdf = gpd.GeoDataFrame(geometry=streets + avenues, crs="EPSG:4326")
+    buildings_gdf = gpd.GeoDataFrame(
+        geometry=[
+            box(lon, lat, lon + 0.004, lat + 0.004)
+            for lon in (-0.24, -0.19, -0.12)
+            for lat in (5.56, 5.62)
+        ],
+        crs="EPSG:4326",
+    )
+    open_space_gdf = gpd.GeoDataFrame(
+        geometry=[box(-0.20, 5.63, -0.16, 5.65), box(-0.14, 5.55, -0.11, 5.58)],
+        crs="EPSG:4326",
+    )
+    return roads_gdf, buildings_gdf, open_space_gdf